@@ -1,32 +1,98 @@
 import os
+import re
 import json
+import hashlib
 import logging
 import asyncio
-from typing import Optional, Dict, Any
+import datetime
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Optional, Dict, Any, AsyncIterator, Annotated, Tuple
 from pathlib import Path
 
 import httpx
-from fastapi import FastAPI, HTTPException, Request
+import ijson
+import msgspec
+import orjson
+import redis.asyncio as redis
+from fastapi import FastAPI, HTTPException, Request, Depends, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse, FileResponse
+from fastapi.responses import HTMLResponse, StreamingResponse, ORJSONResponse
 from fastapi.staticfiles import StaticFiles
-from pydantic import BaseModel, Field
+from fastapi.utils import is_body_allowed_for_status_code
+from starlette.exceptions import HTTPException as StarletteHTTPException
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Configure logging; per-request detail is at DEBUG, access logs come from uvicorn
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper())
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create shared resources on startup and release them on shutdown"""
+    # Fail fast on a misconfigured deployment instead of erroring on every request
+    if not DATABRICKS_API_TOKEN:
+        raise RuntimeError("DATABRICKS_API_TOKEN not configured")
+    # One pooled client per process keeps connections to Databricks warm
+    app.state.http = httpx.AsyncClient(
+        http2=True,
+        timeout=30.0,
+        limits=httpx.Limits(max_keepalive_connections=100, max_connections=200)
+    )
+    # Response cache is optional; without REDIS_URL every request goes to the LLM.
+    # Short timeouts make a hung Redis raise RedisError (a cache miss) instead of stalling requests.
+    app.state.redis = redis.from_url(
+        REDIS_URL,
+        socket_timeout=REDIS_TIMEOUT_SECONDS,
+        socket_connect_timeout=REDIS_TIMEOUT_SECONDS
+    ) if REDIS_URL else None
+    # Per-process LRU in front of Redis so hot keys skip the network round-trip
+    app.state.local_cache = LocalCache(LOCAL_CACHE_SIZE, LOCAL_CACHE_TTL_SECONDS) if REDIS_URL else None
+    # Resolve the public directory once: "/" is served from memory, /static from disk
+    app.state.public_dir = get_public_dir()
+    if app.state.public_dir is None:
+        app.state.index_html = FALLBACK_HTML
+    else:
+        app.state.index_html = (app.state.public_dir / "index.html").read_bytes()
+        # Lifespan can run more than once per app (e.g. repeated test clients); mount only once
+        if not any(getattr(route, "path", None) == "/static" for route in app.routes):
+            app.mount(
+                "/static",
+                CachedStaticFiles(directory=str(app.state.public_dir), html=False),
+                name="static"
+            )
+    # /health serves a body whose timestamp is refreshed in the background
+    app.state.health_body = build_health_body()
+    health_task = asyncio.create_task(refresh_health_body(app))
+    try:
+        yield
+    finally:
+        health_task.cancel()
+        await app.state.http.aclose()
+        if app.state.redis is not None:
+            await app.state.redis.close()
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Excuse Email Draft Tool",
     description="Generate professional excuse emails using Databricks Model Serving",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
+# Error responses go through orjson too, instead of FastAPI's stdlib JSONResponse handler
+@app.exception_handler(StarletteHTTPException)
+async def http_exception_handler(request: Request, exc: StarletteHTTPException):
+    headers = getattr(exc, "headers", None)
+    if not is_body_allowed_for_status_code(exc.status_code):
+        return Response(status_code=exc.status_code, headers=headers)
+    return ORJSONResponse({"detail": exc.detail}, status_code=exc.status_code, headers=headers)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -36,68 +102,89 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Request/Response Models
-class ExcuseRequest(BaseModel):
-    category: str = Field(..., description="Category of excuse")
-    tone: str = Field(..., description="Tone of the email")
-    seriousness: int = Field(..., ge=1, le=5, description="Seriousness level 1-5")
-    recipient_name: str = Field(..., description="Name of the recipient")
-    sender_name: str = Field(..., description="Name of the sender")
-    eta_when: str = Field(..., description="ETA or when information")
+# Request/Response Models (msgspec keeps decode + validation off the hot path)
+class ExcuseRequest(msgspec.Struct):
+    category: Annotated[str, msgspec.Meta(description="Category of excuse")]
+    tone: Annotated[str, msgspec.Meta(description="Tone of the email")]
+    seriousness: Annotated[int, msgspec.Meta(ge=1, le=5, description="Seriousness level 1-5")]
+    recipient_name: Annotated[str, msgspec.Meta(description="Name of the recipient")]
+    sender_name: Annotated[str, msgspec.Meta(description="Name of the sender")]
+    eta_when: Annotated[str, msgspec.Meta(description="ETA or when information")]
 
-class ExcuseResponse(BaseModel):
+class ExcuseResponse(msgspec.Struct):
     subject: str
     body: str
     success: bool
     error: Optional[str] = None
 
-class HealthResponse(BaseModel):
+class HealthResponse(msgspec.Struct):
     status: str
     timestamp: str
     version: str
 
+# JSON schemas for the OpenAPI docs, since FastAPI cannot introspect msgspec Structs
+_, SCHEMAS = msgspec.json.schema_components(
+    [ExcuseRequest, ExcuseResponse, HealthResponse],
+    ref_template="#/components/schemas/{name}"
+)
+
+def openapi_body(name: str) -> Dict[str, Any]:
+    """OpenAPI request body for a msgspec Struct"""
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": SCHEMAS[name]}}
+        }
+    }
+
+def openapi_response(name: str) -> Dict[int, Dict[str, Any]]:
+    """OpenAPI success response for a msgspec Struct"""
+    return {200: {"content": {"application/json": {"schema": SCHEMAS[name]}}}}
+
+async def parse_excuse_request(request: Request) -> ExcuseRequest:
+    """Decode and validate an excuse request body"""
+    try:
+        return msgspec.json.decode(await request.body(), type=ExcuseRequest)
+    except msgspec.DecodeError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
 # Environment configuration
 DATABRICKS_API_TOKEN = os.getenv("DATABRICKS_API_TOKEN")
 DATABRICKS_ENDPOINT_URL = os.getenv(
     "DATABRICKS_ENDPOINT_URL", 
     "https://dbc-32cf6ae7-cf82.staging.cloud.databricks.com/serving-endpoints/databricks-gpt-oss-120b/invocations"
 )
+LLM_CONCURRENCY = int(os.getenv("LLM_CONCURRENCY", "32"))
+LLM_QUEUE_TIMEOUT = float(os.getenv("LLM_QUEUE_TIMEOUT", "10"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+LLM_RETRY_BACKOFF = 0.5
+REDIS_URL = os.getenv("REDIS_URL")
+CACHE_TTL_SECONDS = int(os.getenv("CACHE_TTL_SECONDS", "3600"))
+REDIS_TIMEOUT_SECONDS = float(os.getenv("REDIS_TIMEOUT_SECONDS", "0.25"))
+LOCAL_CACHE_SIZE = int(os.getenv("LOCAL_CACHE_SIZE", "1024"))
+LOCAL_CACHE_TTL_SECONDS = int(os.getenv("LOCAL_CACHE_TTL_SECONDS", "60"))
 PORT = int(os.getenv("PORT", "8000"))
 HOST = os.getenv("HOST", "0.0.0.0")
-
-# Request logging middleware
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    logger.info(f"Request: {request.method} {request.url}")
-    response = await call_next(request)
-    logger.info(f"Response: {response.status_code}")
-    return response
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "4"))
 
 # LLM Integration
-async def generate_excuse_with_llm(request_data: ExcuseRequest) -> ExcuseResponse:
-    """Generate excuse email using Databricks Model Serving"""
-    
-    if not DATABRICKS_API_TOKEN:
-        raise HTTPException(
-            status_code=500, 
-            detail="DATABRICKS_API_TOKEN not configured"
-        )
-    
-    # Create the prompt
-    prompt = f"""Generate a professional excuse email based on the following parameters:
+# Prompt scaffold: only the request fields are formatted per call
+PROMPT_HEAD = "Generate a professional excuse email based on the following parameters:\n\n"
 
-Category: {request_data.category}
-Tone: {request_data.tone}
-Seriousness Level: {request_data.seriousness}/5 (1=very silly, 5=serious)
-Recipient: {request_data.recipient_name}
-Sender: {request_data.sender_name}
-ETA/When: {request_data.eta_when}
+PROMPT_FIELDS = """Category: %s
+Tone: %s
+Seriousness Level: %d/5 (1=very silly, 5=serious)
+Recipient: %s
+Sender: %s
+ETA/When: %s
+"""
 
+PROMPT_TAIL = """
 Please generate a JSON response with the following format:
-{{
+{
     "subject": "Appropriate email subject line",
     "body": "Dear [Recipient],\\n\\n[Apology/Excuse]\\n\\n[Reason/Explanation]\\n\\n[Next Steps/Resolution]\\n\\nBest regards,\\n[Sender]"
-}}
+}
 
 Guidelines:
 - Match the tone (sincere, playful, corporate, or assertive)
@@ -108,104 +195,228 @@ Guidelines:
 - For "assertive" tone: Write in a style that blames the recipient for the situation, use language like "due to your lack of advance notice", "given your unclear instructions", "this could have been avoided if you had", "the miscommunication on your end", "as we previously discussed but you failed to", "per our earlier conversation which you seem to have forgotten", "your poor planning has caused", "the confusion you created", "your failure to communicate properly", make it clear the sender is not at fault and the recipient is responsible
 """
 
+def build_prompt(request_data: ExcuseRequest) -> str:
+    """Build the LLM prompt for an excuse request"""
+    fields = PROMPT_FIELDS % (
+        request_data.category,
+        request_data.tone,
+        request_data.seriousness,
+        request_data.recipient_name,
+        request_data.sender_name,
+        request_data.eta_when,
+    )
+    return "".join((PROMPT_HEAD, fields, PROMPT_TAIL))
+
+# Pre-serialized chat completion payload; only the prompt string is encoded per call
+PAYLOAD_HEAD = b'{"messages":[{"role":"user","content":'
+PAYLOAD_TAIL = b'}],"max_tokens":500,"temperature":0.7}'
+PAYLOAD_STREAM_TAIL = b'}],"max_tokens":500,"temperature":0.7,"stream":true}'
+
+def build_payload(prompt: str, stream: bool = False) -> bytes:
+    """Build the JSON-encoded Databricks chat completion payload"""
+    tail = PAYLOAD_STREAM_TAIL if stream else PAYLOAD_TAIL
+    return PAYLOAD_HEAD + orjson.dumps(prompt) + tail
+
+# Request headers for the Databricks endpoint. Built at import time, so an unset token
+# gives "Bearer None" here; that is only safe because lifespan refuses to start without one.
+LLM_HEADERS = {
+    "Authorization": f"Bearer {DATABRICKS_API_TOKEN}",
+    "Content-Type": "application/json"
+}
+
+def extract_text(message_content: Any) -> str:
+    """Extract text from a message content field (string or list of parts)"""
+    if isinstance(message_content, list):
+        # Find the text content in the list
+        for item in message_content:
+            if isinstance(item, dict) and item.get("type") == "text":
+                return item.get("text", "")
+        # Fallback: convert list to string
+        return str(message_content)
+    return message_content or ""
+
+# Where the completion lives in each supported response format
+CONTENT_PREFIXES = (
+    "choices.item.message.content",
+    "predictions.item",
+    "candidates.item.content",
+)
+
+class ResponseReader:
+    """Async file-like view of an httpx response body, for ijson"""
+
+    def __init__(self, response: httpx.Response):
+        self._chunks = response.aiter_bytes()
+
+    async def drain(self) -> None:
+        """Read the rest of the body so the connection goes back to the pool"""
+        async for _ in self._chunks:
+            pass
+
+    async def read(self, size: int = -1) -> bytes:
+        # ijson probes with read(0) to detect bytes vs str, which must not consume data
+        if size == 0:
+            return b""
+        try:
+            return await self._chunks.__anext__()
+        except StopAsyncIteration:
+            return b""
+
+async def read_content(response: httpx.Response) -> str:
+    """Stream-parse a Databricks response, building only the first completion - handle different response formats"""
+    reader = ResponseReader(response)
+    builder = None
+    target = None
+    content = ""
+    async for prefix, event, value in ijson.parse_async(reader):
+        if builder is None:
+            if prefix not in CONTENT_PREFIXES or event in ("end_map", "end_array", "map_key"):
+                continue
+            builder = ijson.ObjectBuilder()
+            target = prefix
+        builder.event(event, value)
+        # Done once the value is a scalar or its container closes at the target prefix
+        if prefix == target and event not in ("start_map", "start_array", "map_key"):
+            content = builder.value
+            if target == "choices.item.message.content":
+                content = extract_text(content)
+            break
+    # Stop parsing, but still consume the body; a partly read response closes its connection
+    await reader.drain()
+    return content
+
+def extract_delta(chunk: Dict[str, Any]) -> str:
+    """Extract the incremental text from a streamed chat completion chunk"""
+    choices = chunk.get("choices") or []
+    if not choices:
+        return ""
+    delta = choices[0].get("delta", {}).get("content", "")
+    if isinstance(delta, list):
+        # Only text parts are part of the email; reasoning parts are dropped
+        return "".join(
+            item.get("text", "") for item in delta
+            if isinstance(item, dict) and item.get("type") == "text"
+        )
+    return delta or ""
+
+# A fenced ```json block takes precedence; the outermost bare {...} is only a fallback,
+# since a stray brace before the fence would otherwise start the bare match too early
+FENCED_JSON_RE = re.compile(r"```(?:json)?\s*(\{.*?\})\s*```", re.DOTALL)
+BARE_JSON_RE = re.compile(r"\{.*\}", re.DOTALL)
+DEFAULT_SUBJECT = "Excuse Email"
+DEFAULT_BODY = "Email content could not be generated."
+
+def parse_email(content: str, request_data: ExcuseRequest) -> Tuple[ExcuseResponse, bool]:
+    """Parse the generated email JSON from the LLM content, falling back to a simple email
+
+    Returns the response and whether it was parsed from the LLM output (False for the fallback).
+    """
+    # Try to parse JSON from the content
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            headers = {
-                "Authorization": f"Bearer {DATABRICKS_API_TOKEN}",
-                "Content-Type": "application/json"
-            }
-            
-            payload = {
-                "messages": [
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                "max_tokens": 500,
-                "temperature": 0.7
-            }
-            
-            logger.info(f"Making request to Databricks endpoint: {DATABRICKS_ENDPOINT_URL}")
-            response = await client.post(
+        # Find the JSON object, whether wrapped in markdown fences or bare
+        match = FENCED_JSON_RE.search(content) or BARE_JSON_RE.search(content)
+        if match:
+            json_content = match.group(match.lastindex or 0)
+            parsed_content = orjson.loads(json_content)
+            subject = parsed_content.get("subject", DEFAULT_SUBJECT)
+            body = parsed_content.get("body", DEFAULT_BODY)
+            # Structs aren't validated on construction, so reject null/non-string fields here
+            if not isinstance(subject, str) or not isinstance(body, str):
+                raise ValueError("Email subject and body must be strings")
+            parsed = True
+        else:
+            raise json.JSONDecodeError("No JSON object found", content, 0)
+        
+    except (ValueError, KeyError) as e:
+        logger.warning(f"Could not parse JSON response: {e}")
+        # Fallback: create a simple email instead of returning raw JSON
+        subject = f"{request_data.category} - {request_data.eta_when}"
+        body = f"Dear {request_data.recipient_name},\n\nI wanted to let you know that I will be {request_data.category.lower()}.\n\n{request_data.eta_when}\n\nBest regards,\n{request_data.sender_name}"
+        parsed = False
+    
+    return ExcuseResponse(
+        subject=subject,
+        body=body,
+        success=True,
+        error=None
+    ), parsed
+
+# Caps in-flight calls to the serving endpoint; excess requests queue, then get a 503
+LLM_SEMAPHORE = asyncio.Semaphore(LLM_CONCURRENCY)
+
+@asynccontextmanager
+async def llm_slot():
+    """Reserve an outbound LLM call slot, failing with 503 if none frees up in time"""
+    try:
+        await asyncio.wait_for(LLM_SEMAPHORE.acquire(), timeout=LLM_QUEUE_TIMEOUT)
+    except asyncio.TimeoutError:
+        logger.warning("LLM concurrency limit reached, rejecting request")
+        raise HTTPException(status_code=503, detail="LLM service busy, please retry")
+    try:
+        yield
+    finally:
+        LLM_SEMAPHORE.release()
+
+@asynccontextmanager
+async def open_llm_stream(client: httpx.AsyncClient, payload: bytes):
+    """Open a streamed POST to the Databricks endpoint, retrying rate-limited calls with exponential backoff"""
+    async with llm_slot():
+        for attempt in range(LLM_MAX_RETRIES + 1):
+            async with client.stream(
+                "POST",
                 DATABRICKS_ENDPOINT_URL,
-                headers=headers,
-                json=payload
-            )
-            
-            logger.info(f"Databricks response status: {response.status_code}")
+                headers=LLM_HEADERS,
+                content=payload
+            ) as response:
+                if response.status_code != 429 or attempt == LLM_MAX_RETRIES:
+                    yield response
+                    # httpx only pools the connection if the body was read to the end
+                    if not response.is_closed:
+                        logger.warning("Databricks response was not fully read, connection will not be reused")
+                    return
+                await response.aread()
+            delay = LLM_RETRY_BACKOFF * 2 ** attempt
+            logger.warning(f"Databricks rate limited the request, retrying in {delay}s")
+            await asyncio.sleep(delay)
+
+# Completions above this size are parsed in a worker thread so they don't stall the event loop
+LARGE_PAYLOAD_SIZE = 32_768
+
+async def parse_email_async(content: str, request_data: ExcuseRequest) -> Tuple[ExcuseResponse, bool]:
+    """Parse the generated email, offloading unusually large content to a thread"""
+    if len(content) > LARGE_PAYLOAD_SIZE:
+        return await asyncio.to_thread(parse_email, content, request_data)
+    return parse_email(content, request_data)
+
+async def generate_excuse_with_llm(
+    request_data: ExcuseRequest, client: httpx.AsyncClient
+) -> Tuple[ExcuseResponse, bool]:
+    """Generate excuse email using Databricks Model Serving, reporting whether it was parsed from the LLM output"""
+    
+    prompt = build_prompt(request_data)
+    payload = build_payload(prompt)
+
+    try:
+        logger.debug("Making request to Databricks endpoint: %s", DATABRICKS_ENDPOINT_URL)
+        async with open_llm_stream(client, payload) as response:
+            logger.debug("Databricks response status: %s", response.status_code)
             
             if response.status_code != 200:
+                await response.aread()
                 logger.error(f"Databricks API error: {response.status_code} - {response.text}")
                 raise HTTPException(
                     status_code=500,
                     detail=f"LLM service error: {response.status_code}"
                 )
             
-            result = response.json()
-            logger.info(f"Databricks response: {result}")
-            
-            # Parse the response - handle different response formats
-            content = ""
-            if "choices" in result and len(result["choices"]) > 0:
-                message_content = result["choices"][0].get("message", {}).get("content", "")
-                # Handle both string and list formats
-                if isinstance(message_content, list):
-                    # Find the text content in the list
-                    for item in message_content:
-                        if isinstance(item, dict) and item.get("type") == "text":
-                            content = item.get("text", "")
-                            break
-                    if not content:
-                        # Fallback: convert list to string
-                        content = str(message_content)
-                else:
-                    content = message_content
-            elif "predictions" in result and len(result["predictions"]) > 0:
-                content = result["predictions"][0]
-            elif "candidates" in result and len(result["candidates"]) > 0:
-                content = result["candidates"][0].get("content", "")
-            else:
-                content = str(result)
-            
-            logger.info(f"Extracted content: {content}")
-            
-            # Try to parse JSON from the content
-            try:
-                # Extract JSON from the response if it's wrapped in markdown
-                if "```json" in content:
-                    json_start = content.find("```json") + 7
-                    json_end = content.find("```", json_start)
-                    content = content[json_start:json_end].strip()
-                elif "```" in content:
-                    json_start = content.find("```") + 3
-                    json_end = content.find("```", json_start)
-                    content = content[json_start:json_end].strip()
-                
-                # Try to find JSON object in the content
-                json_start = content.find('{')
-                json_end = content.rfind('}') + 1
-                if json_start != -1 and json_end > json_start:
-                    json_content = content[json_start:json_end]
-                    parsed_content = json.loads(json_content)
-                    subject = parsed_content.get("subject", "Excuse Email")
-                    body = parsed_content.get("body", "Email content could not be generated.")
-                else:
-                    raise json.JSONDecodeError("No JSON object found", content, 0)
-                
-            except (json.JSONDecodeError, KeyError) as e:
-                logger.warning(f"Could not parse JSON response: {e}")
-                # Fallback: create a simple email instead of returning raw JSON
-                subject = f"{request_data.category} - {request_data.eta_when}"
-                body = f"Dear {request_data.recipient_name},\n\nI wanted to let you know that I will be {request_data.category.lower()}.\n\n{request_data.eta_when}\n\nBest regards,\n{request_data.sender_name}"
-            
-            return ExcuseResponse(
-                subject=subject,
-                body=body,
-                success=True,
-                error=None
-            )
-            
+            content = await read_content(response)
+        
+        logger.debug("Extracted content: %s", content)
+        
+        return await parse_email_async(content, request_data)
+        
+    except HTTPException:
+        raise
     except httpx.TimeoutException:
         logger.error("Timeout calling Databricks API")
         raise HTTPException(status_code=504, detail="Request timeout")
@@ -216,118 +427,291 @@ Guidelines:
         logger.error(f"Unexpected error: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+# Framing of the Databricks chat completion stream
+SSE_DATA_PREFIX = "data:"
+SSE_DATA_OFFSET = len(SSE_DATA_PREFIX)
+SSE_DONE = "[DONE]"
+
+def sse_event(data: Any, event: Optional[str] = None) -> str:
+    """Format a server-sent event frame"""
+    frame = f"event: {event}\n" if event else ""
+    return f"{frame}data: {orjson.dumps(data).decode()}\n\n"
+
+async def stream_excuse_with_llm(
+    request_data: ExcuseRequest, client: httpx.AsyncClient
+) -> AsyncIterator[str]:
+    """Stream excuse email tokens from Databricks Model Serving as server-sent events"""
+    
+    prompt = build_prompt(request_data)
+    payload = build_payload(prompt, stream=True)
+    content = ""
+
+    try:
+        logger.debug("Making streaming request to Databricks endpoint: %s", DATABRICKS_ENDPOINT_URL)
+        async with open_llm_stream(client, payload) as response:
+            logger.debug("Databricks response status: %s", response.status_code)
+        
+            if response.status_code != 200:
+                error_text = (await response.aread()).decode(errors="replace")
+                logger.error(f"Databricks API error: {response.status_code} - {error_text}")
+                yield sse_event({"detail": f"LLM service error: {response.status_code}"}, event="error")
+                return
+        
+            async for line in response.aiter_lines():
+                if not line.startswith(SSE_DATA_PREFIX):
+                    continue
+                data = line[SSE_DATA_OFFSET:].strip()
+                if data == SSE_DONE:
+                    # Keep reading to the end of the body so the connection is reused
+                    continue
+                try:
+                    chunk = orjson.loads(data)
+                except orjson.JSONDecodeError:
+                    logger.warning(f"Skipping malformed stream chunk: {data}")
+                    continue
+                delta = extract_delta(chunk)
+                if delta:
+                    content += delta
+                    yield sse_event({"delta": delta})
+
+        logger.debug("Extracted content: %s", content)
+        email, _ = await parse_email_async(content, request_data)
+        yield sse_event(msgspec.to_builtins(email), event="done")
+            
+    except HTTPException as e:
+        yield sse_event({"detail": e.detail}, event="error")
+    except httpx.TimeoutException:
+        logger.error("Timeout calling Databricks API")
+        yield sse_event({"detail": "Request timeout"}, event="error")
+    except httpx.RequestError as e:
+        logger.error(f"Request error: {e}")
+        yield sse_event({"detail": "Network error"}, event="error")
+    except Exception as e:
+        logger.error(f"Unexpected error: {e}")
+        yield sse_event({"detail": "Internal server error"}, event="error")
+
+# Response Cache
+def cache_key(request_data: ExcuseRequest) -> str:
+    """Build a cache key from the normalized request fields"""
+    # Struct fields always encode in declaration order, so the encoding is stable
+    return "excuse:" + hashlib.sha256(msgspec.json.encode(request_data)).hexdigest()
+
+class LocalCache:
+    """In-process LRU of encoded responses with a per-entry expiry"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: bytes) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+async def get_cached_excuse(state: Any, key: str) -> Optional[bytes]:
+    """Look up an encoded excuse response, locally then in Redis, treating cache errors as misses"""
+    if state.redis is None:
+        return None
+    cached = state.local_cache.get(key)
+    if cached is not None:
+        return cached
+    try:
+        cached = await state.redis.get(key)
+    except redis.RedisError as e:
+        logger.warning(f"Cache lookup failed: {e}")
+        return None
+    if cached is not None:
+        state.local_cache.set(key, cached)
+    return cached
+
+async def set_cached_excuse(state: Any, key: str, body: bytes) -> None:
+    """Store an encoded excuse response locally and in Redis, ignoring cache errors"""
+    if state.redis is None:
+        return
+    state.local_cache.set(key, body)
+    try:
+        await state.redis.setex(key, CACHE_TTL_SECONDS, body)
+    except redis.RedisError as e:
+        logger.warning(f"Cache store failed: {e}")
+
 # API Endpoints
-@app.post("/api/generate-excuse", response_model=ExcuseResponse)
-async def generate_excuse(request: ExcuseRequest):
+@app.post(
+    "/api/generate-excuse",
+    openapi_extra=openapi_body("ExcuseRequest"),
+    responses=openapi_response("ExcuseResponse")
+)
+async def generate_excuse(http_request: Request, request: ExcuseRequest = Depends(parse_excuse_request)):
     """Generate an excuse email based on the provided parameters"""
     try:
-        return await generate_excuse_with_llm(request)
+        state = http_request.app.state
+        key = cache_key(request)
+        body = await get_cached_excuse(state, key)
+        if body is None:
+            response, parsed = await generate_excuse_with_llm(request, state.http)
+            body = msgspec.json.encode(response)
+            # Don't pin the fallback email for every identical request until the TTL expires
+            if parsed:
+                await set_cached_excuse(state, key, body)
+        return Response(content=body, media_type="application/json")
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Error generating excuse: {e}")
         raise HTTPException(status_code=500, detail="Failed to generate excuse")
 
-@app.get("/health", response_model=HealthResponse)
-async def health_check():
-    """Health check endpoint"""
-    import datetime
-    return HealthResponse(
+@app.post("/api/generate-excuse/stream", openapi_extra=openapi_body("ExcuseRequest"))
+async def generate_excuse_stream(http_request: Request, request: ExcuseRequest = Depends(parse_excuse_request)):
+    """Stream an excuse email as server-sent events while the LLM generates it"""
+    return StreamingResponse(
+        stream_excuse_with_llm(request, http_request.app.state.http),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+def build_health_body() -> bytes:
+    """Serialize the current health status"""
+    return msgspec.json.encode(HealthResponse(
         status="healthy",
         timestamp=datetime.datetime.utcnow().isoformat(),
         version="1.0.0"
-    )
+    ))
+
+async def refresh_health_body(app: FastAPI) -> None:
+    """Keep the cached health body's timestamp current to within a second"""
+    while True:
+        await asyncio.sleep(1)
+        app.state.health_body = build_health_body()
+
+@app.get("/health", responses=openapi_response("HealthResponse"))
+async def health_check(request: Request):
+    """Health check endpoint"""
+    return Response(request.app.state.health_body, media_type="application/json")
+
+# Probe bodies are constant, so they are serialized once. A fresh Response is still
+# built per call because middleware may append headers to a response's header list.
+HEALTHZ_BODY = b'{"status":"ok"}'
+READY_BODY = b'{"status":"ready"}'
+PING_BODY = b'{"message":"pong"}'
+METRICS_BODY = b"# HELP excuse_generator_requests_total Total number of requests\n# TYPE excuse_generator_requests_total counter\nexcuse_generator_requests_total 0\n"
+METRICS_MEDIA_TYPE = "text/plain; version=0.0.4"
 
 @app.get("/healthz")
 async def healthz():
     """Kubernetes-style health check"""
-    return {"status": "ok"}
+    return Response(HEALTHZ_BODY, media_type="application/json")
 
 @app.get("/ready")
 async def ready():
     """Readiness check"""
-    return {"status": "ready"}
+    return Response(READY_BODY, media_type="application/json")
 
 @app.get("/ping")
 async def ping():
     """Simple ping endpoint"""
-    return {"message": "pong"}
+    return Response(PING_BODY, media_type="application/json")
 
 @app.get("/metrics")
 async def metrics():
     """Prometheus-style metrics endpoint"""
-    return "# HELP excuse_generator_requests_total Total number of requests\n# TYPE excuse_generator_requests_total counter\nexcuse_generator_requests_total 0\n"
+    return Response(METRICS_BODY, media_type=METRICS_MEDIA_TYPE)
 
 @app.get("/debug")
-async def debug():
+async def debug(request: Request):
     """Debug endpoint for environment information"""
     return {
         "environment": {
             "DATABRICKS_ENDPOINT_URL": DATABRICKS_ENDPOINT_URL,
-            "DATABRICKS_API_TOKEN": "***" if DATABRICKS_API_TOKEN else "Not set",
+            "DATABRICKS_API_TOKEN": "***",
             "PORT": PORT,
             "HOST": HOST,
         },
         "paths": {
             "current_dir": os.getcwd(),
             "app_dir": Path(__file__).parent,
-            "public_dir": Path(__file__).parent.parent / "public",
+            "public_dir": request.app.state.public_dir,
         }
     }
 
 # Static file serving with multiple path resolution
-def get_static_file_path():
-    """Get the path to the static HTML file with multiple fallback locations"""
+def get_public_dir() -> Optional[Path]:
+    """Get the public directory containing index.html with multiple fallback locations"""
     possible_paths = [
-        Path(__file__).parent.parent / "public" / "index.html",
-        Path("public") / "index.html",
-        Path("index.html"),
-        Path(__file__).parent / "public" / "index.html",
+        Path(__file__).parent.parent / "public",
+        Path("public"),
+        Path(__file__).parent / "public",
     ]
     
     for path in possible_paths:
-        if path.exists():
+        if (path / "index.html").exists():
             logger.info(f"Serving static files from: {path}")
             return path
     
     logger.error("Could not find index.html in any expected location")
     return None
 
+# Fallback HTML if index.html is not found
+FALLBACK_HTML = b"""
+<!DOCTYPE html>
+<html>
+<head>
+    <title>Excuse Email Draft Tool</title>
+    <style>
+        body { font-family: Arial, sans-serif; margin: 40px; }
+        .error { color: red; }
+    </style>
+</head>
+<body>
+    <h1>Excuse Email Draft Tool</h1>
+    <p class="error">Error: Could not find the application files.</p>
+    <p>Please ensure the public/index.html file exists.</p>
+</body>
+</html>
+"""
+
+# index.html is unhashed, so browsers only cache it briefly; hashed assets never change
+INDEX_CACHE_CONTROL = "public, max-age=60"
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+HASHED_ASSET_RE = re.compile(r"\.[0-9a-f]{8,}\.[A-Za-z0-9]+$")
+
+class CachedStaticFiles(StaticFiles):
+    """StaticFiles that marks content-hashed assets as immutable"""
+
+    def file_response(self, full_path, stat_result, scope, status_code=200):
+        response = super().file_response(full_path, stat_result, scope, status_code)
+        if HASHED_ASSET_RE.search(os.path.basename(full_path)):
+            response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+        return response
+
 @app.get("/", response_class=HTMLResponse)
-async def serve_app():
+async def serve_app(request: Request):
     """Serve the React application"""
-    static_path = get_static_file_path()
-    if static_path and static_path.exists():
-        return FileResponse(static_path)
-    else:
-        # Fallback HTML if file not found
-        return HTMLResponse("""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>Excuse Email Draft Tool</title>
-            <style>
-                body { font-family: Arial, sans-serif; margin: 40px; }
-                .error { color: red; }
-            </style>
-        </head>
-        <body>
-            <h1>Excuse Email Draft Tool</h1>
-            <p class="error">Error: Could not find the application files.</p>
-            <p>Please ensure the public/index.html file exists.</p>
-        </body>
-        </html>
-        """)
-
-# Mount static files (fallback)
-try:
-    public_path = Path(__file__).parent.parent / "public"
-    if public_path.exists():
-        app.mount("/static", StaticFiles(directory=str(public_path)), name="static")
-except Exception as e:
-    logger.warning(f"Could not mount static files: {e}")
+    return HTMLResponse(
+        request.app.state.index_html,
+        headers={"Cache-Control": INDEX_CACHE_CONTROL}
+    )
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host=HOST, port=PORT)
+    # Workers need an import string so each process builds its own app and lifespan resources
+    uvicorn.run(
+        "app:app",
+        host=HOST,
+        port=PORT,
+        workers=WEB_CONCURRENCY,
+        loop="uvloop",
+        http="httptools"
+    )
 